@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: © 2023 Mohamed El Morabity
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Provide a persistent cache for Jenkins crumbs."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import time
+
+
+class CrumbCache:
+    """A class to persist Jenkins crumbs between linter runs.
+
+    Jenkins crumbs are bound to the web session they were issued for, so the
+    session cookies are stored along with the crumb.
+    """
+
+    DEFAULT_PATH = (
+        Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+        / "jenkinsfilelint"
+    )
+    TTL = 1800
+
+    def __init__(
+        self,
+        url: str,
+        username: str | None = None,
+        path: Path = DEFAULT_PATH,
+        ttl: int = TTL,
+    ) -> None:
+        """Initialize a new instance of the `CrumbCache` class.
+
+        Args:
+            url (str): The base URL of the Jenkins server.
+            username (str | None, optional): The Jenkins username the crumb is
+                issued for. Defaults to `None`.
+            path (Path, optional): The directory to store cached crumbs in.
+                Defaults to `DEFAULT_PATH`.
+            ttl (int, optional): Time in seconds after which a cached crumb is
+                considered expired. Defaults to `TTL`.
+        """
+        key = hashlib.sha256(
+            f"{url.rstrip('/')}|{username or ''}".encode()
+        ).hexdigest()
+        self._path = path / f"{key}.json"
+        self._ttl = ttl
+
+    def load(self) -> tuple[dict[str, str], dict[str, str]] | None:
+        """Load a crumb and its session cookies from the cache.
+
+        Returns:
+            tuple[dict[str, str], dict[str, str]] | None: A tuple containing
+                the crumb header and the session cookies, or `None` if no valid
+                crumb is cached.
+        """
+        try:
+            if time.time() - self._path.stat().st_mtime > self._ttl:
+                return None
+            data = json.loads(self._path.read_text())
+            crumb = data["crumb"]
+            cookies = data["cookies"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if not isinstance(crumb, dict) or not isinstance(cookies, dict):
+            return None
+
+        logging.debug("Loading crumb from cache file %s", self._path)
+        return (crumb, cookies)
+
+    def save(self, crumb: dict[str, str], cookies: dict[str, str]) -> None:
+        """Store a crumb and its session cookies in the cache.
+
+        Args:
+            crumb (dict[str, str]): The crumb header.
+            cookies (dict[str, str]): The session cookies the crumb is bound
+                to.
+        """
+        try:
+            self._path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd = os.open(
+                self._path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+            )
+            with os.fdopen(fd, "w") as cache_writer:
+                json.dump({"crumb": crumb, "cookies": cookies}, cache_writer)
+        except OSError as ex:
+            logging.debug("Unable to write cache file %s: %s", self._path, ex)
+
+    def clear(self) -> None:
+        """Remove the cached crumb, if any."""
+        with contextlib.suppress(OSError):
+            self._path.unlink()
@@ -7,17 +7,35 @@ from __future__ import annotations
 
 from argparse import ArgumentDefaultsHelpFormatter
 from argparse import ArgumentParser
+from argparse import ArgumentTypeError
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import logging
 import os
 from pathlib import Path
 
+from jenkinsfilelint.cache import CrumbCache
 from jenkinsfilelint.config import Config
+from jenkinsfilelint.exceptions import CrumbError
 from jenkinsfilelint.exceptions import LinterError
 from jenkinsfilelint.jenkins import Jenkins
 
 logging.basicConfig(format="%(levelname)s: %(message)s")
 
 
+def _positive_int(value: str) -> int:
+    try:
+        result = int(value)
+    except ValueError:
+        result = 0
+
+    if result <= 0:
+        msg = f"invalid positive integer value: '{value}'"
+        raise ArgumentTypeError(msg)
+
+    return result
+
+
 def _argument_parser() -> ArgumentParser:
     parser = ArgumentParser(
         description="Jenkins declarative pipeline linter",
@@ -47,6 +65,19 @@ def _argument_parser() -> ArgumentParser:
         default=Jenkins.TIMEOUT,
         help="timeout from reading data from Jenkins instance",
     )
+    parser.add_argument(
+        "-j",
+        "--max-concurrent-requests",
+        type=_positive_int,
+        default=Jenkins.MAX_CONCURRENT_REQUESTS,
+        help="maximum number of Jenkinsfiles linted concurrently",
+    )
+    parser.add_argument(
+        "--no-cache",
+        default=False,
+        action="store_true",
+        help="do not cache the Jenkins crumb between runs",
+    )
     parser.add_argument(
         "-d",
         "--debug",
@@ -64,6 +95,18 @@ def _argument_parser() -> ArgumentParser:
     return parser
 
 
+def _lint(jenkins: Jenkins, path: Path) -> bool:
+    try:
+        return jenkins.lint(path)
+    except CrumbError:
+        # Failing to retrieve the crumb affects all Jenkinsfiles: let the
+        # caller report it only once
+        raise
+    except LinterError as ex:
+        logging.error(ex)
+        return False
+
+
 def main(argv: list[str] | None = None) -> int:
     """Entry point for the command-line interface.
 
@@ -92,21 +135,24 @@ def main(argv: list[str] | None = None) -> int:
             logging.error(ex)
             return 1
 
+    jenkins = Jenkins(
+        url,
+        username=username,
+        password=password,
+        insecure=args.insecure,
+        max_concurrent_requests=args.max_concurrent_requests,
+        crumb_cache=None if args.no_cache else CrumbCache(url, username),
+    )
+
     try:
-        jenkins = Jenkins(
-            url, username=username, password=password, insecure=args.insecure
-        )
-    except LinterError as ex:
+        with jenkins, ThreadPoolExecutor(
+            max_workers=args.max_concurrent_requests
+        ) as executor:
+            results = list(
+                executor.map(partial(_lint, jenkins), args.jenkinsfile)
+            )
+    except CrumbError as ex:
         logging.error(ex)
         return 1
 
-    status = True
-    with jenkins:
-        for path in args.jenkinsfile:
-            try:
-                status &= jenkins.lint(path)
-            except LinterError as ex:  # noqa: PERF203
-                status &= False
-                logging.error(ex)
-
-    return 0 if status else 1
+    return 0 if all(results) else 1
@@ -7,12 +7,35 @@ from __future__ import annotations
 
 from configparser import ConfigParser
 from configparser import Error
+from functools import lru_cache
 from pathlib import Path
+from stat import S_ISREG
 from typing import ClassVar
 
 from jenkinsfilelint.exceptions import ConfigError
 
 
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return None
+
+    return stat_result.st_mtime_ns if S_ISREG(stat_result.st_mode) else None
+
+
+@lru_cache(maxsize=32)
+def _load(
+    files: tuple[tuple[str, int], ...]
+) -> tuple[ConfigParser, list[str]]:
+    # Configuration files are identified by their modification time as well as
+    # their path, so that a modified file is parsed again
+    config_parser = ConfigParser()
+    read_paths = config_parser.read(path for path, _ in files)
+
+    return (config_parser, read_paths)
+
+
 class Config:
     """A class to manage configuration for the Jenkinsfile linter."""
 
@@ -33,14 +56,20 @@ class Config:
             ConfigError: If the configuration file cannot be opened or if there
                 is an error parsing the configuration file.
         """
-        self._config_parser = ConfigParser()
+        candidates = [path] if path else self._DEFAULT_CONFIG_PATHS
+        paths = [str(p) for p in candidates]
 
-        paths = [
-            str(p) for p in ([path] if path else self._DEFAULT_CONFIG_PATHS)
-        ]
+        # Only existing files are passed to the parser, each candidate being
+        # stat'ed once
+        files = tuple(
+            (str(p), mtime_ns)
+            for p in candidates
+            if (mtime_ns := _mtime_ns(p)) is not None
+        )
 
         try:
-            self._path = self._config_parser.read(paths).pop()
+            self._config_parser, read_paths = _load(files)
+            self._path = read_paths[-1]
         except IndexError:
             msg = (
                 f"Unable to load configuration file{'s'[:len(paths) ^ 1]} "
@@ -14,3 +14,7 @@ class JenkinsError(LinterError):
 
 class ConfigError(LinterError):
     """Raised if linter configuration file cannot be opened or parsed."""
+
+
+class CrumbError(JenkinsError):
+    """Raised if a crumb cannot be retrieved from a Jenkins server."""
@@ -5,31 +5,56 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http import HTTPStatus
+from operator import itemgetter
 import re
+import sys
+from threading import Lock
 import typing
 
+from requests import HTTPError
 from requests import RequestException
 from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import urllib3
 from urllib3.exceptions import InsecureRequestWarning
 
+from jenkinsfilelint.exceptions import CrumbError
 from jenkinsfilelint.exceptions import JenkinsError
 
+try:
+    import orjson as json
+except ImportError:  # pragma: no cover
+    import json  # type: ignore[no-redef]
+
 if typing.TYPE_CHECKING:  # pragma: no cover
     from pathlib import Path
     from types import TracebackType
 
     from requests import Response
 
+    from jenkinsfilelint.cache import CrumbCache
+
+_MESSAGE_RE = re.compile(
+    r"^(?P<message>.*?)(:?\s*@ line\s*(?P<line>\d+), "
+    r"column (?P<column>\d+)\.)?$",
+    flags=re.DOTALL,
+)
+_CONTENT_RE = re.compile(r"^Jenkinsfile content '.+' did not", flags=re.DOTALL)
+
 
 class Jenkins:
     """A class for interacting with a Jenkins server to perform linting."""
 
     TIMEOUT = 30
+    MAX_CONCURRENT_REQUESTS = 8
     _CRUMB_PATH = (
         'crumbIssuer/api/xml?xpath=concat(//crumbRequestField,":",//crumb)'
     )
+    _CRUMB_PREFIX = "jenkins-crumb:"
     _VALIDATOR_PATH = "pipeline-model-converter/validateJenkinsfile"
     _VALIDATOR_SUCCESS = "success"
 
@@ -40,6 +65,8 @@ class Jenkins:
         password: str | None = None,
         insecure: bool = False,
         timeout: int = TIMEOUT,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        crumb_cache: CrumbCache | None = None,
     ) -> None:
         """Initialize a new instance of the Jenkins class.
 
@@ -53,11 +80,30 @@ class Jenkins:
                 requests. Defaults to `False`.
             timeout (int, optional): Timeout from reading data from Jenkins
                 instance. Defaults to `TIMEOUT`.
+            max_concurrent_requests (int, optional): Maximum number of
+                connections kept open to the Jenkins instance. Defaults to
+                `MAX_CONCURRENT_REQUESTS`.
+            crumb_cache (CrumbCache | None, optional): The cache to load the
+                crumb from and store it into. Defaults to `None`.
         """
         self._url = url.rstrip("/")
+        self._crumb_url = f"{self._url}/{self._CRUMB_PATH}"
+        self._validator_url = f"{self._url}/{self._VALIDATOR_PATH}"
 
         self._session = Session()
 
+        # Share a single pool of keep-alive connections to the Jenkins
+        # instance between all threads using the session. Failed requests are
+        # not retried.
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_concurrent_requests,
+            max_retries=0,
+            pool_block=True,
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
         if username:
             self._session.auth = HTTPBasicAuth(username, password or "")
 
@@ -65,65 +111,119 @@ class Jenkins:
         if insecure:
             urllib3.disable_warnings(InsecureRequestWarning)
 
-        self._session.hooks["response"].append(
-            lambda r, *_args, **_kwargs: r.raise_for_status()
-        )
-
         self._timeout = timeout
-        self._crumb = self._get_crumb()
+        self._crumb_cache = crumb_cache
+        self._crumb_lock = Lock()
+        self._output_lock = Lock()
+
+        # Fetch the crumb in the background, while Jenkinsfiles are read
+        self._crumb_executor = ThreadPoolExecutor(max_workers=1)
+        self._crumb_future = self._crumb_executor.submit(self._load_crumb)
 
     def _query(
         self,
         method: str,
-        path: str,
-        data: dict[str, str] | None = None,
+        url: str,
+        data: dict[str, bytes] | None = None,
         headers: dict[str, str] | None = None,
     ) -> Response:
-        url = f"{self._url}/{path}"
         try:
             response = self._session.request(
                 method, url, data=data, headers=headers, timeout=self._timeout
             )
+            # Only check the status once the response body is read, so the
+            # connection is released to the pool
+            response.raise_for_status()
         except RequestException as ex:
             raise JenkinsError(ex) from ex
 
         return response
 
     def _get_crumb(self) -> dict[str, str]:
-        response = self._query("get", self._CRUMB_PATH)
-        if not response.text.lower().startswith("jenkins-crumb:"):
-            raise JenkinsError(
+        try:
+            response = self._query("get", self._crumb_url)
+        except JenkinsError as ex:
+            raise CrumbError(*ex.args) from ex.__cause__
+
+        prefix = response.text[: len(self._CRUMB_PREFIX)]
+        if prefix.lower() != self._CRUMB_PREFIX:
+            raise CrumbError(
                 f"Unable to retrieve crumb from {self._url}. Crumb issuer "
                 "is probably blocked."
             )
 
-        crumb = response.text.split(":")
-        return {crumb[0].strip(): crumb[1].strip()}
+        field, _, crumb = response.text.partition(":")
+        return {field.strip(): crumb.strip()}
+
+    def _load_crumb(self) -> tuple[dict[str, str], bool]:
+        if self._crumb_cache and (cached := self._crumb_cache.load()):
+            crumb, cookies = cached
+            self._session.cookies.update(cookies)
+            return (crumb, True)
+
+        crumb = self._get_crumb()
+        if self._crumb_cache:
+            self._crumb_cache.save(crumb, self._session.cookies.get_dict())
+
+        return (crumb, False)
+
+    def _refresh_crumb(self, crumb: dict[str, str]) -> None:
+        with self._crumb_lock:
+            # Another thread may already have refreshed the crumb
+            if self._crumb_future.result()[0] is not crumb:
+                return
+
+            if self._crumb_cache:
+                self._crumb_cache.clear()
+            self._session.cookies.clear()
+            self._crumb_future = self._crumb_executor.submit(self._load_crumb)
+
+    def _validate(self, jenkinsfile_content: bytes) -> dict[str, typing.Any]:
+        crumb, crumb_cached = self._crumb_future.result()
+        data: dict[str, bytes] = {"jenkinsfile": jenkinsfile_content}
+
+        try:
+            response = self._query(
+                "post", self._validator_url, data=data, headers=crumb
+            )
+        except JenkinsError as ex:
+            cause = ex.__cause__
+            if not (
+                crumb_cached
+                and isinstance(cause, HTTPError)
+                and cause.response is not None
+                and cause.response.status_code == HTTPStatus.FORBIDDEN
+            ):
+                raise
+
+            # The cached crumb is no longer valid
+            self._refresh_crumb(crumb)
+            crumb, _ = self._crumb_future.result()
+            response = self._query(
+                "post", self._validator_url, data=data, headers=crumb
+            )
+
+        try:
+            result: dict[str, typing.Any] = json.loads(response.content)
+        except ValueError as ex:
+            raise JenkinsError(ex) from ex
+
+        return result
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _parse_error(message: str) -> tuple[int, int, str]:
-        message_re = re.compile(
-            r"^(?P<message>.*?)(:?\s*@ line\s*(?P<line>\d+), "
-            r"column (?P<column>\d+)\.)?$",
-            flags=re.DOTALL,
-        )
-
         line = 1
         column = 1
 
-        if match := message_re.match(message):
+        if match := _MESSAGE_RE.match(message):
             message = match.group("message")
             if _line := match.group("line"):
                 line = int(_line)
             if _column := match.group("column"):
                 column = int(_column)
 
-        message = re.sub(
-            r"^Jenkinsfile content '.+' did not",
-            "Jenkinsfile did not",
-            message,
-            flags=re.DOTALL,
-        )
+        message = _CONTENT_RE.sub("Jenkinsfile did not", message)
 
         return (line, column, message)
 
@@ -134,6 +234,7 @@ class Jenkins:
             path (Path): The path to the Jenkinsfile to be linted.
 
         Raises:
+            CrumbError: If no crumb can be retrieved from the Jenkins instance.
             JenkinsError: If an error occurs while communicating with the
                 Jenkins instance.
 
@@ -141,35 +242,39 @@ class Jenkins:
             bool: `True` if the Jenkinsfile is valid; `False` otherwise.
         """
         try:
-            jenkinsfile_reader = path.open("rb")
+            jenkinsfile_content = path.read_bytes()
         except OSError as ex:
             raise JenkinsError(ex) from ex
 
-        with jenkinsfile_reader:
-            try:
-                jenkinsfile_content = jenkinsfile_reader.read().decode()
-            except UnicodeDecodeError as ex:
-                raise JenkinsError(ex) from ex
-
-        response = self._query(
-            "post",
-            self._VALIDATOR_PATH,
-            data={"jenkinsfile": jenkinsfile_content},
-            headers=self._crumb,
-        )
-        result = response.json()
+        # Only check the Jenkinsfile is valid UTF-8: the raw content is sent
+        # as is, to avoid decoding and encoding it back
+        try:
+            jenkinsfile_content.decode()
+        except UnicodeDecodeError as ex:
+            raise JenkinsError(ex) from ex
+
+        result = self._validate(jenkinsfile_content)
         data = result.get("data") or {}
 
-        _errors = [
+        _errors = (
             (*self._parse_error(message), level)
             for errors in (data.get("errors") or [])
             for level, messages in errors.items()
             for message in (
                 messages if isinstance(messages, list) else [messages]
             )
-        ]
-        for line, column, error, level in sorted(_errors, key=lambda x: x[0]):
-            print(f"{path}:{line}:{column}: {level}: {error}")
+        )
+        report = "".join(
+            f"{path}:{line}:{column}: {level}: {error}\n"
+            for line, column, error, level in sorted(
+                _errors, key=itemgetter(0)
+            )
+        )
+        if report:
+            # Keep the report of each Jenkinsfile contiguous when linting
+            # concurrently
+            with self._output_lock:
+                sys.stdout.write(report)
 
         status: str = result["data"]["result"]
         return status == self._VALIDATOR_SUCCESS
@@ -198,5 +303,7 @@ class Jenkins:
             traceback (TracebackType | None): The traceback of the exception
                 raised in the `with` block, if any.
         """
+        # Wait for any pending crumb retrieval before closing the session
+        self._crumb_executor.shutdown()
         if self._session:
             self._session.close()
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: © 2023 Mohamed El Morabity
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from jenkinsfilelint.cache import CrumbCache
+
+
+class TestCrumbCache(TestCase):
+    URL = "https://example.net"
+    CRUMB = {"Jenkins-Crumb": "0123456789abcdef"}  # noqa: RUF012
+    COOKIES = {"JSESSIONID": "fedcba9876543210"}  # noqa: RUF012
+
+    def setUp(self) -> None:
+        cache_dir = TemporaryDirectory()
+        self.cache_path = Path(cache_dir.name) / "jenkinsfilelint"
+        self.addCleanup(cache_dir.cleanup)
+
+    def test_cache_empty(self) -> None:
+        self.assertIsNone(CrumbCache(self.URL, path=self.cache_path).load())
+
+    def test_cache_save_load(self) -> None:
+        CrumbCache(self.URL, path=self.cache_path).save(
+            self.CRUMB, self.COOKIES
+        )
+
+        self.assertEqual(
+            CrumbCache(self.URL + "/", path=self.cache_path).load(),
+            (self.CRUMB, self.COOKIES),
+        )
+        (cache_file,) = self.cache_path.iterdir()
+        self.assertEqual(cache_file.stat().st_mode & 0o777, 0o600)
+
+    def test_cache_per_user(self) -> None:
+        CrumbCache(self.URL, username="user1", path=self.cache_path).save(
+            self.CRUMB, self.COOKIES
+        )
+
+        self.assertIsNone(
+            CrumbCache(self.URL, username="user2", path=self.cache_path).load()
+        )
+
+    def test_cache_expired(self) -> None:
+        cache = CrumbCache(self.URL, path=self.cache_path, ttl=60)
+        cache.save(self.CRUMB, self.COOKIES)
+
+        (cache_file,) = self.cache_path.iterdir()
+        os.utime(cache_file, (0, 0))
+
+        self.assertIsNone(cache.load())
+
+    def test_cache_corrupted(self) -> None:
+        cache = CrumbCache(self.URL, path=self.cache_path)
+        cache.save(self.CRUMB, self.COOKIES)
+
+        for content in ("not JSON", "[]", '{"crumb": [], "cookies": {}}'):
+            (cache_file,) = self.cache_path.iterdir()
+            cache_file.write_text(content)
+
+            self.assertIsNone(cache.load())
+
+    def test_cache_clear(self) -> None:
+        cache = CrumbCache(self.URL, path=self.cache_path)
+        cache.save(self.CRUMB, self.COOKIES)
+        cache.clear()
+
+        self.assertIsNone(cache.load())
+        # Clearing an empty cache is a no-op
+        cache.clear()
+
+    def test_cache_not_writable(self) -> None:
+        self.cache_path.write_text("")
+        cache = CrumbCache(self.URL, path=self.cache_path)
+
+        with self.assertLogs(level="DEBUG") as log_context:
+            cache.save(self.CRUMB, self.COOKIES)
+
+        self.assertIn("Unable to write cache file", log_context.output[0])
+        self.assertIsNone(cache.load())
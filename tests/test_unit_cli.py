@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import contextlib
+from io import StringIO
 import logging
 import os
 import typing
@@ -11,10 +13,13 @@ import unittest.mock
 
 import jenkinsfilelint.cli
 from jenkinsfilelint.exceptions import ConfigError
+from jenkinsfilelint.exceptions import CrumbError
 from jenkinsfilelint.exceptions import JenkinsError
+from jenkinsfilelint.jenkins import Jenkins
 
 if typing.TYPE_CHECKING:
     from pathlib import Path
+    from unittest.mock import MagicMock
 
 
 class TestCli(TestCase):
@@ -23,9 +28,18 @@ class TestCli(TestCase):
         self.config_mock = config_patch.start()
         self.addCleanup(config_patch.stop)
 
+        crumb_cache_patch = unittest.mock.patch(
+            "jenkinsfilelint.cli.CrumbCache"
+        )
+        self.crumb_cache_mock = crumb_cache_patch.start()
+        self.addCleanup(crumb_cache_patch.stop)
+
         jenkins_patch = unittest.mock.patch("jenkinsfilelint.cli.Jenkins")
         self.jenkins_mock = jenkins_patch.start()
         self.addCleanup(jenkins_patch.stop)
+        self.jenkins_mock.MAX_CONCURRENT_REQUESTS = (
+            Jenkins.MAX_CONCURRENT_REQUESTS
+        )
 
         # Set valid configuration
         self.config_mock.return_value.get.return_value = (
@@ -45,17 +59,26 @@ class TestCli(TestCase):
         self.assertEqual(status, 1)
         self.assertIn(exception_message, log_context.output[0])
 
-    def test_cli_jenkins_error(self) -> None:
-        exception_message = "Bad config"
-        self.jenkins_mock.side_effect = JenkinsError(exception_message)
+    def test_cli_crumb_error(self) -> None:
+        exception_message = "Crumb failure"
+        # The same crumb failure is raised while linting each Jenkinsfile
+        self.jenkins_mock.return_value.lint.side_effect = CrumbError(
+            exception_message
+        )
 
         with self.assertLogs(level="ERROR") as log_context:
-            status = jenkinsfilelint.cli.main(["Jenkinsfile"])
+            status = jenkinsfilelint.cli.main(["jf1", "jf2", "jf3"])
 
         self.assertEqual(status, 1)
         self.jenkins_mock.assert_called_with(
-            "url", username="username", password="password", insecure=False
+            "url",
+            username="username",
+            password="password",
+            insecure=False,
+            max_concurrent_requests=Jenkins.MAX_CONCURRENT_REQUESTS,
+            crumb_cache=self.crumb_cache_mock.return_value,
         )
+        self.assertEqual(len(log_context.output), 1)
         self.assertIn(exception_message, log_context.output[0])
 
     def test_cli_lint_ko(self) -> None:
@@ -63,7 +86,12 @@ class TestCli(TestCase):
 
         self.assertEqual(jenkinsfilelint.cli.main(["jf1", "jf2", "jf3"]), 1)
         self.jenkins_mock.assert_called_with(
-            "url", username="username", password="password", insecure=False
+            "url",
+            username="username",
+            password="password",
+            insecure=False,
+            max_concurrent_requests=Jenkins.MAX_CONCURRENT_REQUESTS,
+            crumb_cache=self.crumb_cache_mock.return_value,
         )
 
     def test_cli_lint_error(self) -> None:
@@ -79,7 +107,12 @@ class TestCli(TestCase):
 
         self.assertEqual(status, 1)
         self.jenkins_mock.assert_called_with(
-            "url", username="username", password="password", insecure=False
+            "url",
+            username="username",
+            password="password",
+            insecure=False,
+            max_concurrent_requests=Jenkins.MAX_CONCURRENT_REQUESTS,
+            crumb_cache=self.crumb_cache_mock.return_value,
         )
         self.assertIn(exception_message, log_context.output[0])
 
@@ -88,8 +121,52 @@ class TestCli(TestCase):
 
         self.assertEqual(jenkinsfilelint.cli.main(["jf1", "jf2", "jf3"]), 0)
         self.jenkins_mock.assert_called_with(
-            "url", username="username", password="password", insecure=False
+            "url",
+            username="username",
+            password="password",
+            insecure=False,
+            max_concurrent_requests=Jenkins.MAX_CONCURRENT_REQUESTS,
+            crumb_cache=self.crumb_cache_mock.return_value,
+        )
+
+    @unittest.mock.patch("jenkinsfilelint.cli.ThreadPoolExecutor")
+    def test_cli_max_concurrent_requests(
+        self, executor_mock: MagicMock
+    ) -> None:
+        executor_mock.return_value.__enter__.return_value.map.return_value = [
+            True
+        ]
+
+        status = jenkinsfilelint.cli.main(
+            ["--max-concurrent-requests", "2", "Jenkinsfile"]
+        )
+
+        self.assertEqual(status, 0)
+        executor_mock.assert_called_once_with(max_workers=2)
+        self.assertEqual(
+            self.jenkins_mock.call_args.kwargs["max_concurrent_requests"], 2
+        )
+
+    def test_cli_max_concurrent_requests_invalid(self) -> None:
+        for value in ("0", "-1", "foo"):
+            with self.assertRaises(
+                SystemExit
+            ) as context, contextlib.redirect_stderr(StringIO()) as stderr:
+                jenkinsfilelint.cli.main(
+                    ["--max-concurrent-requests", value, "Jenkinsfile"]
+                )
+
+            self.assertEqual(context.exception.code, 2)
+            self.assertIn(
+                f"invalid positive integer value: '{value}'", stderr.getvalue()
+            )
+
+    def test_cli_no_cache(self) -> None:
+        self.assertEqual(
+            jenkinsfilelint.cli.main(["--no-cache", "Jenkinsfile"]), 0
         )
+        self.crumb_cache_mock.assert_not_called()
+        self.assertIsNone(self.jenkins_mock.call_args.kwargs["crumb_cache"])
 
     @unittest.mock.patch.dict(
         os.environ,
@@ -101,8 +178,14 @@ class TestCli(TestCase):
     )
     def test_cli_config_env(self) -> None:
         self.assertEqual(jenkinsfilelint.cli.main(["Jenkinsfile"]), 0)
+        self.crumb_cache_mock.assert_called_with("url2", "username2")
         self.jenkins_mock.assert_called_with(
-            "url2", username="username2", password="password2", insecure=False
+            "url2",
+            username="username2",
+            password="password2",
+            insecure=False,
+            max_concurrent_requests=Jenkins.MAX_CONCURRENT_REQUESTS,
+            crumb_cache=self.crumb_cache_mock.return_value,
         )
 
     def test_cli_debug(self) -> None:
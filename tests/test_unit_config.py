@@ -1,8 +1,10 @@
 # SPDX-FileCopyrightText: © 2023 Mohamed El Morabity
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import os
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from jenkinsfilelint.config import Config
@@ -19,6 +21,16 @@ class TestConfig(TestCase):
             f"Unable to load configuration file {path}", str(context.exception)
         )
 
+    def test_config_not_file(self) -> None:
+        with TemporaryDirectory() as path, self.assertRaises(
+            ConfigError
+        ) as context:
+            Config(Path(path))
+
+        self.assertEqual(
+            f"Unable to load configuration file {path}", str(context.exception)
+        )
+
     def test_config_not_ini(self) -> None:
         with NamedTemporaryFile() as config_file:
             config_file.write(b"Not an INI file")
@@ -107,3 +119,25 @@ class TestConfig(TestCase):
             linter_config = Config(Path(config_file.name))
             with self.assertRaises(ConfigError):
                 linter_config.get(profile="custom")
+
+    def test_config_cached(self) -> None:
+        with NamedTemporaryFile() as config_file:
+            config_file.write(b"[default]\nurl = https://example.net\n")
+            config_file.seek(0)
+
+            linter_config1 = Config(Path(config_file.name))
+            linter_config2 = Config(Path(config_file.name))
+
+            self.assertIs(
+                linter_config1._config_parser, linter_config2._config_parser
+            )
+
+            config_file.seek(0, os.SEEK_END)
+            config_file.write(b"username = username\n")
+            config_file.flush()
+            # Make sure the modification time changes
+            os.utime(config_file.name, ns=(0, 0))
+
+            result = Config(Path(config_file.name)).get()
+
+        self.assertEqual(result, ("https://example.net", "username", None))
@@ -1,66 +1,207 @@
 # SPDX-FileCopyrightText: © 2023 Mohamed El Morabity
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from __future__ import annotations
+
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import contextlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 from io import StringIO
+import json
 from pathlib import Path
-from tempfile import NamedTemporaryFile
+from tempfile import TemporaryDirectory
+from threading import Lock
+from threading import Thread
+from typing import Any
+from typing import ClassVar
 from unittest import TestCase
 import unittest.mock
 from unittest.mock import MagicMock
 
 from requests import ConnectTimeout
+from requests import HTTPError
+from requests.adapters import HTTPAdapter
+from requests_mock import ANY
 from requests_mock import Mocker
 from urllib3.exceptions import InsecureRequestWarning
 
+from jenkinsfilelint.cache import CrumbCache
+from jenkinsfilelint.exceptions import CrumbError
 from jenkinsfilelint.exceptions import JenkinsError
 from jenkinsfilelint.jenkins import Jenkins
 
+_RESPONSE_OK = {"status": "ok", "data": {"result": "success"}}
+_RESPONSE_KO_SYNTAX = {
+    "status": "ok",
+    "data": {
+        "result": "failure",
+        "errors": [
+            {
+                "error": [
+                    "Expected a stage @ line 4, column 5.",
+                    "No stages specified @ line 3, column 3.",
+                ]
+            }
+        ],
+    },
+}
+_RESPONSE_KO_NOT_JENKINSFILE = {
+    "status": "ok",
+    "data": {
+        "result": "failure",
+        "errors": [{"error": "unexpected token: default @ line 1, column 2."}],
+    },
+}
+_RESPONSE_KO_NO_PIPELINE = {
+    "status": "ok",
+    "data": {
+        "result": "failure",
+        "errors": [
+            {
+                "error": "Jenkinsfile content 'node {\n\t"
+                "stage('Build') {\n\t\techo \"Building...\"\n\t}\n}"
+                "\n\n ' did not contain the 'pipeline' step"
+            }
+        ],
+    },
+}
+
+
+class _JenkinsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _JenkinsRequestHandler)
+        self.crumb = "0123456789abcdef"
+        self.validator_status = HTTPStatus.OK
+        self.lock = Lock()
+        self.requests: list[tuple[str, str | None]] = []
+
+
+class _JenkinsRequestHandler(BaseHTTPRequestHandler):
+    # Keep connections alive, so they are pooled by the Jenkins client
+    protocol_version = "HTTP/1.1"
+    server: _JenkinsServer
+
+    def _respond(self, status: HTTPStatus, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        with self.server.lock:
+            self.server.requests.append(("GET", None))
+
+        self._respond(
+            HTTPStatus.OK, f"Jenkins-Crumb:{self.server.crumb}".encode()
+        )
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        crumb = self.headers.get("Jenkins-Crumb")
+        with self.server.lock:
+            self.server.requests.append(("POST", crumb))
+
+        if self.server.validator_status != HTTPStatus.OK:
+            self._respond(self.server.validator_status)
+        elif crumb != self.server.crumb:
+            self._respond(HTTPStatus.FORBIDDEN)
+        else:
+            self._respond(HTTPStatus.OK, json.dumps(_RESPONSE_OK).encode())
+
+    def log_message(self, *_args: object) -> None:
+        pass
+
 
 class TestJenkins(TestCase):
     JENKINS_URL = "https://example.net"
     JENKINS_USERNAME = "username"
     JENKINS_PASSWORD = "password"
-
-    def setUp(self) -> None:
-        self.urllib3_disable_warnings = unittest.mock.patch(
-            "jenkinsfilelint.jenkins.urllib3.disable_warnings"
+    CRUMB_URL = f"{JENKINS_URL}/{Jenkins._CRUMB_PATH}"
+    VALIDATOR_URL = f"{JENKINS_URL}/{Jenkins._VALIDATOR_PATH}"
+    JENKINS_AUTHORIZATION = (
+        "Basic "
+        + base64.b64encode(
+            f"{JENKINS_USERNAME}:{JENKINS_PASSWORD}".encode()
+        ).decode()
+    )
+
+    exit_stack: ClassVar[contextlib.ExitStack]
+    jenkinsfile_dir: ClassVar[Path]
+    jenkinsfile: ClassVar[Path]
+    requests_mock: ClassVar[Mocker]
+    jenkins: ClassVar[Jenkins]
+
+    @classmethod
+    def setUpClass(cls: type[TestJenkins]) -> None:
+        cls.exit_stack = contextlib.ExitStack()
+
+        # Share an empty Jenkinsfile between tests not depending on its content
+        cls.jenkinsfile_dir = Path(
+            cls.exit_stack.enter_context(TemporaryDirectory())
         )
+        cls.jenkinsfile = cls.jenkinsfile_dir / "Jenkinsfile"
+        cls.jenkinsfile.touch()
+
+        cls.requests_mock = cls.exit_stack.enter_context(Mocker())
+        cls._mock_crumb()
 
-        self.requests_mock = Mocker()
-        self.requests_mock.start()
+        # Share a Jenkins client between tests only exercising linting
+        cls.jenkins = cls.exit_stack.enter_context(Jenkins(cls.JENKINS_URL))
+        cls.jenkins._crumb_future.result()
 
-        # Set valid Jenkins crumb by default
-        self.requests_mock.get(
-            f"{self.JENKINS_URL}/{Jenkins._CRUMB_PATH}",
-            text="Jenkins-Crumb:0123456789abcdef",
+    @classmethod
+    def tearDownClass(cls: type[TestJenkins]) -> None:
+        cls.exit_stack.close()
+
+    @classmethod
+    def _mock_crumb(cls: type[TestJenkins]) -> None:
+        # Set valid Jenkins crumb
+        cls.requests_mock.get(
+            cls.CRUMB_URL, text="Jenkins-Crumb:0123456789abcdef"
         )
 
-    def tearDown(self) -> None:
-        self.requests_mock.stop()
+    def setUp(self) -> None:
+        # Matchers cannot be removed from the class-wide mocker. As the latest
+        # registered one takes precedence, shadow those left over by previous
+        # tests with a catch-all answering any unexpected request with an
+        # error, then register the default ones again.
+        self.requests_mock.reset_mock()
+        self.requests_mock.register_uri(ANY, ANY, status_code=599)
+        self._mock_crumb()
+
+    def _lint(self, jenkins_response: dict[str, Any]) -> tuple[bool, str]:
+        with unittest.mock.patch.object(
+            self.jenkins, "_validate", return_value=jenkins_response
+        ), contextlib.redirect_stdout(StringIO()) as stdout:
+            result = self.jenkins.lint(self.jenkinsfile)
+
+        return (result, stdout.getvalue())
 
     def test_crumb_failure(self) -> None:
         # Override Jenkins crumb retrieving
-        self.requests_mock.get(
-            f"{self.JENKINS_URL}/{Jenkins._CRUMB_PATH}", exc=ConnectTimeout
-        )
+        self.requests_mock.get(self.CRUMB_URL, exc=ConnectTimeout)
 
-        with self.assertRaises(JenkinsError) as context, Jenkins(
+        with self.assertRaises(CrumbError) as context, Jenkins(
             self.JENKINS_URL
-        ):
-            pass
+        ) as jenkins:
+            jenkins.lint(self.jenkinsfile)
 
-        self.assertEqual(type(context.exception.args[0]), ConnectTimeout)
+        self.assertIsInstance(context.exception.args[0], ConnectTimeout)
+        self.assertEqual(self.requests_mock.call_count, 1)
 
     def test_bad_crumb(self) -> None:
         # Override Jenkins crumb retrieving
-        self.requests_mock.get(
-            f"{self.JENKINS_URL}/{Jenkins._CRUMB_PATH}", text="XXXXXXXX"
-        )
+        self.requests_mock.get(self.CRUMB_URL, text="XXXXXXXX")
 
-        with self.assertRaises(JenkinsError), Jenkins(self.JENKINS_URL):
-            pass
+        with self.assertRaises(CrumbError), Jenkins(
+            self.JENKINS_URL
+        ) as jenkins:
+            jenkins.lint(self.jenkinsfile)
 
     def test_auth(self) -> None:
         with Jenkins(
@@ -71,11 +212,8 @@ class TestJenkins(TestCase):
             pass
 
         history = self.requests_mock.request_history[0]
-        auth = base64.b64encode(
-            f"{self.JENKINS_USERNAME}:{self.JENKINS_PASSWORD}".encode()
-        )
         self.assertEqual(
-            history.headers.get("Authorization"), "Basic " + auth.decode()
+            history.headers.get("Authorization"), self.JENKINS_AUTHORIZATION
         )
 
     def test_no_auth(self) -> None:
@@ -85,135 +223,177 @@ class TestJenkins(TestCase):
         history = self.requests_mock.request_history[0]
         self.assertFalse(history.headers.get("Authorization"))
 
-    def test_lint_ok(self) -> None:
-        jenkins_response = {"status": "ok", "data": {"result": "success"}}
-        self.requests_mock.post(
-            f"{self.JENKINS_URL}/{Jenkins._VALIDATOR_PATH}",
-            json=jenkins_response,
+    def test_crumb_cache_miss(self) -> None:
+        crumb_cache = MagicMock()
+        crumb_cache.load.return_value = None
+
+        with Jenkins(self.JENKINS_URL, crumb_cache=crumb_cache):
+            pass
+
+        self.assertEqual(self.requests_mock.call_count, 1)
+        crumb_cache.save.assert_called_once_with(
+            {"Jenkins-Crumb": "0123456789abcdef"}, {}
+        )
+
+    def test_crumb_cache_hit(self) -> None:
+        crumb_cache = MagicMock()
+        crumb_cache.load.return_value = (
+            {"Jenkins-Crumb": "cached"},
+            {"JSESSIONID": "session"},
         )
+        self.requests_mock.post(self.VALIDATOR_URL, json=_RESPONSE_OK)
 
-        stdout = StringIO()
-        with contextlib.redirect_stdout(
-            stdout
-        ), NamedTemporaryFile() as path, Jenkins(self.JENKINS_URL) as jenkins:
-            result = jenkins.lint(Path(path.name))
+        with Jenkins(self.JENKINS_URL, crumb_cache=crumb_cache) as jenkins:
+            self.assertTrue(jenkins.lint(self.jenkinsfile))
 
-        self.assertTrue(result)
-        self.assertFalse(stdout.getvalue())
-
-    def test_lint_ko_syntax(self) -> None:
-        jenkins_response = {
-            "status": "ok",
-            "data": {
-                "result": "failure",
-                "errors": [
-                    {
-                        "error": [
-                            "Expected a stage @ line 4, column 5.",
-                            "No stages specified @ line 3, column 3.",
-                        ]
-                    }
-                ],
-            },
-        }
+        self.assertEqual(self.requests_mock.call_count, 1)
+        history = self.requests_mock.request_history[0]
+        self.assertEqual(history.headers.get("Jenkins-Crumb"), "cached")
+        self.assertEqual(history.headers.get("Cookie"), "JSESSIONID=session")
+        crumb_cache.save.assert_not_called()
+
+    def test_crumb_cache_expired(self) -> None:
+        crumb_cache = MagicMock()
+        crumb_cache.load.side_effect = [
+            ({"Jenkins-Crumb": "expired"}, {"JSESSIONID": "expired"}),
+            None,
+        ]
         self.requests_mock.post(
-            f"{self.JENKINS_URL}/{Jenkins._VALIDATOR_PATH}",
-            json=jenkins_response,
+            self.VALIDATOR_URL, [{"status_code": 403}, {"json": _RESPONSE_OK}]
         )
 
-        stdout = StringIO()
-        with contextlib.redirect_stdout(
-            stdout
-        ), NamedTemporaryFile() as path, Jenkins(self.JENKINS_URL) as jenkins:
-            result = jenkins.lint(Path(path.name))
-
-        self.assertFalse(result)
-        self.assertTrue(stdout.getvalue())
-        for message in (
-            f"{path.name}:4:5: error: Expected a stage",
-            f"{path.name}:3:3: error: No stages specified",
-        ):
-            self.assertIn(message, stdout.getvalue())
-
-    def test_lint_ko_not_jenkinsfile(self) -> None:
-        jenkins_response = {
-            "status": "ok",
-            "data": {
-                "result": "failure",
-                "errors": [
-                    {"error": "unexpected token: default @ line 1, column 2."}
-                ],
-            },
-        }
-        self.requests_mock.post(
-            f"{self.JENKINS_URL}/{Jenkins._VALIDATOR_PATH}",
-            json=jenkins_response,
+        with Jenkins(self.JENKINS_URL, crumb_cache=crumb_cache) as jenkins:
+            self.assertTrue(jenkins.lint(self.jenkinsfile))
+
+        crumb_cache.clear.assert_called_once()
+        crumb_cache.save.assert_called_once()
+        history = self.requests_mock.request_history
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[2].headers.get("Cookie"), None)
+        self.assertEqual(
+            history[2].headers.get("Jenkins-Crumb"), "0123456789abcdef"
         )
 
-        stdout = StringIO()
-        with contextlib.redirect_stdout(
-            stdout
-        ), NamedTemporaryFile() as path, Jenkins(self.JENKINS_URL) as jenkins:
-            result = jenkins.lint(Path(path.name))
+    def test_crumb_already_refreshed(self) -> None:
+        crumb_cache = MagicMock()
+        crumb_cache.load.return_value = None
+
+        with Jenkins(self.JENKINS_URL, crumb_cache=crumb_cache) as jenkins:
+            jenkins._refresh_crumb({"Jenkins-Crumb": "stale"})
+
+        crumb_cache.clear.assert_not_called()
+        self.assertEqual(self.requests_mock.call_count, 1)
+
+    def test_lint_forbidden(self) -> None:
+        self.requests_mock.post(self.VALIDATOR_URL, status_code=403)
+
+        with self.assertRaises(JenkinsError), Jenkins(
+            self.JENKINS_URL
+        ) as jenkins:
+            jenkins.lint(self.jenkinsfile)
+
+        self.assertEqual(self.requests_mock.call_count, 2)
+
+    def test_connection_pool(self) -> None:
+        with Jenkins(self.JENKINS_URL, max_concurrent_requests=4) as jenkins:
+            for prefix in ("http://", "https://"):
+                # requests-mock patches get_adapter() while the crumb is
+                # being retrieved, so look the mounted adapter up directly
+                adapter = jenkins._session.adapters[prefix]
+                if not isinstance(adapter, HTTPAdapter):
+                    self.fail(f"Unexpected adapter for {prefix}: {adapter}")
+                pool_kw = adapter.poolmanager.connection_pool_kw
+                self.assertEqual(pool_kw["maxsize"], 4)
+                self.assertTrue(pool_kw["block"])
+                self.assertEqual(adapter.max_retries.total, 0)
+
+    def test_lint_ok(self) -> None:
+        result, output = self._lint(_RESPONSE_OK)
+
+        self.assertTrue(result)
+        self.assertFalse(output)
+
+    def test_lint_content(self) -> None:
+        self.requests_mock.post(self.VALIDATOR_URL, json=_RESPONSE_OK)
 
-        self.assertFalse(result)
-        self.assertTrue(stdout.getvalue())
-        self.assertIn(
-            f"{path.name}:1:2: error: unexpected token", stdout.getvalue()
+        path = self.jenkinsfile_dir / "Jenkinsfile-content"
+        path.write_text("pipeline { // é\n}", encoding="utf-8")
+        self.addCleanup(path.unlink)
+
+        self.jenkins.lint(path)
+
+        history = self.requests_mock.request_history[0]
+        self.assertEqual(
+            history.text, "jenkinsfile=pipeline+%7B+%2F%2F+%C3%A9%0A%7D"
         )
 
-    def test_lint_ko_no_pipeline(self) -> None:
-        jenkins_response = {
-            "status": "ok",
-            "data": {
-                "result": "failure",
-                "errors": [
-                    {
-                        "error": "Jenkinsfile content 'node {\n\t"
-                        "stage('Build') {\n\t\techo \"Building...\"\n\t}\n}"
-                        "\n\n ' did not contain the 'pipeline' step"
-                    }
+    def test_lint_ko(self) -> None:
+        for jenkins_response, lines in (
+            (
+                _RESPONSE_KO_SYNTAX,
+                [
+                    "3:3: error: No stages specified",
+                    "4:5: error: Expected a stage",
                 ],
-            },
-        }
-        self.requests_mock.post(
-            f"{self.JENKINS_URL}/{Jenkins._VALIDATOR_PATH}",
-            json=jenkins_response,
-        )
+            ),
+            (
+                _RESPONSE_KO_NOT_JENKINSFILE,
+                ["1:2: error: unexpected token: default"],
+            ),
+            (
+                _RESPONSE_KO_NO_PIPELINE,
+                [
+                    "1:1: error: Jenkinsfile did not contain the 'pipeline' "
+                    "step"
+                ],
+            ),
+        ):
+            with self.subTest(lines=lines):
+                result, output = self._lint(jenkins_response)
 
-        stdout = StringIO()
-        with contextlib.redirect_stdout(
-            stdout
-        ), NamedTemporaryFile() as path, Jenkins(self.JENKINS_URL) as jenkins:
-            result = jenkins.lint(Path(path.name))
-
-        self.assertFalse(result)
-        self.assertTrue(stdout.getvalue())
-        self.assertIn(
-            f"{path.name}:1:1: error: Jenkinsfile did not contain the "
-            "'pipeline' step",
-            stdout.getvalue(),
-        )
+                self.assertFalse(result)
+                self.assertEqual(
+                    output,
+                    "".join(f"{self.jenkinsfile}:{line}\n" for line in lines),
+                )
+
+    def test_lint_invalid_response(self) -> None:
+        self.requests_mock.post(self.VALIDATOR_URL, text="Not JSON")
+
+        with self.assertRaises(JenkinsError) as context:
+            self.jenkins.lint(self.jenkinsfile)
+
+        self.assertIsInstance(context.exception.args[0], ValueError)
+
+    def test_lint_unexpected_request(self) -> None:
+        with self.assertRaises(JenkinsError) as context:
+            self.jenkins.lint(self.jenkinsfile)
+
+        self.assertIsInstance(context.exception.args[0], HTTPError)
+        self.assertEqual(context.exception.args[0].response.status_code, 599)
 
     def test_lint_file_not_exists(self) -> None:
         with self.assertRaises(JenkinsError) as context:
-            Jenkins(self.JENKINS_URL).lint(Path("/no/file/here"))
+            self.jenkins.lint(Path("/no/file/here"))
 
-        self.assertTrue(isinstance(context.exception.args[0], OSError))
+        self.assertIsInstance(context.exception.args[0], OSError)
+        self.assertFalse(self.requests_mock.called)
 
     def test_lint_file_not_text(self) -> None:
-        with NamedTemporaryFile() as path:
-            path.write(b"\x80")
-            path.seek(0)
-            with self.assertRaises(JenkinsError) as context:
-                Jenkins(self.JENKINS_URL).lint(Path(path.name))
-
-        self.assertTrue(
-            isinstance(context.exception.args[0], UnicodeDecodeError)
+        with unittest.mock.patch.object(
+            Path, "read_bytes", return_value=b"\x80"
+        ), self.assertRaises(JenkinsError) as context:
+            self.jenkins.lint(self.jenkinsfile)
+
+        self.assertIsInstance(context.exception.args[0], UnicodeDecodeError)
+
+    def test_lint_insecure(self) -> None:
+        disable_warnings_patch = unittest.mock.patch(
+            "jenkinsfilelint.jenkins.urllib3.disable_warnings"
         )
+        disable_warnings_mock = disable_warnings_patch.start()
+        self.addCleanup(disable_warnings_patch.stop)
 
-    @unittest.mock.patch("jenkinsfilelint.jenkins.urllib3.disable_warnings")
-    def test_lint_insecure(self, disable_warnings_patch: MagicMock) -> None:
         with Jenkins(
             self.JENKINS_URL,
             username=self.JENKINS_USERNAME,
@@ -222,7 +402,7 @@ class TestJenkins(TestCase):
         ):
             pass
 
-        disable_warnings_patch.assert_not_called()
+        disable_warnings_mock.assert_not_called()
 
         with Jenkins(
             self.JENKINS_URL,
@@ -232,4 +412,70 @@ class TestJenkins(TestCase):
         ):
             pass
 
-        disable_warnings_patch.assert_called_once_with(InsecureRequestWarning)
+        disable_warnings_mock.assert_called_once_with(InsecureRequestWarning)
+
+
+class TestJenkinsServer(TestCase):
+    """Test the Jenkins client against a local server.
+
+    Unlike requests-mock, this goes through the connection pool of the client.
+    """
+
+    def setUp(self) -> None:
+        self.server = _JenkinsServer()
+        Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        ).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+        jenkinsfile_dir = TemporaryDirectory()
+        self.addCleanup(jenkinsfile_dir.cleanup)
+        self.jenkinsfile = Path(jenkinsfile_dir.name) / "Jenkinsfile"
+        self.jenkinsfile.touch()
+
+    def test_lint_http_errors(self) -> None:
+        self.server.validator_status = HTTPStatus.INTERNAL_SERVER_ERROR
+
+        # Connections must be released on HTTP errors, or linting more
+        # Jenkinsfiles than the pool size waits forever for one
+        with Jenkins(self.url, max_concurrent_requests=2) as jenkins:
+            for _ in range(3):
+                with self.assertRaises(JenkinsError) as context:
+                    jenkins.lint(self.jenkinsfile)
+
+                self.assertIsInstance(context.exception.args[0], HTTPError)
+
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_crumb_cache_expired_concurrent(self) -> None:
+        cache_dir = TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        crumb_cache = CrumbCache(self.url, path=Path(cache_dir.name))
+        # The Jenkins session behind the cached crumb has expired
+        crumb_cache.save(
+            {"Jenkins-Crumb": "expired"}, {"JSESSIONID": "expired"}
+        )
+
+        # Connections of rejected requests must be released, or refreshing the
+        # crumb waits forever for one once all of them are used
+        with Jenkins(
+            self.url, max_concurrent_requests=4, crumb_cache=crumb_cache
+        ) as jenkins, ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(jenkins.lint, [self.jenkinsfile] * 6))
+
+        self.assertEqual(results, [True] * 6)
+        self.assertEqual(self.server.requests.count(("GET", None)), 1)
+        self.assertEqual(
+            self.server.requests.count(("POST", self.server.crumb)), 6
+        )
+        self.assertEqual(
+            len(self.server.requests),
+            7 + self.server.requests.count(("POST", "expired")),
+        )
+        self.assertEqual(
+            crumb_cache.load(), ({"Jenkins-Crumb": self.server.crumb}, {})
+        )